@@ -3,10 +3,17 @@
 """Spectra Analyze (A1000) bulk file uploader."""
 
 import argparse
+import concurrent.futures
+import email.utils
 import fnmatch
+import functools
 import inspect
+import mmap
 import os
+import random
+import re
 import sys
+import threading
 import time
 
 import requests
@@ -61,13 +68,29 @@ def parse_args():
         "--sleep", type=float, default=float(os.environ.get("RL_SLEEP", "2")),
         help="Seconds to wait between uploads (default: 2, or set RL_SLEEP)",
     )
+    p.add_argument(
+        "--sorted", dest="sorted", action="store_true", default=False,
+        help="Buffer the scan and upload in sorted path order (disables streaming)",
+    )
+    p.add_argument(
+        "--workers", type=int, default=int(os.environ.get("RL_WORKERS", "8")),
+        help="Number of concurrent uploads (default: 8, or set RL_WORKERS)",
+    )
     p.add_argument(
         "--retries", type=int, default=3,
         help="Max upload retries per file (default: 3)",
     )
     p.add_argument(
         "--retry-delay", type=float, default=5,
-        help="Base retry delay in seconds, multiplied by attempt (default: 5)",
+        help="Base retry delay in seconds, doubled per attempt (default: 5)",
+    )
+    p.add_argument(
+        "--max-retry-delay", type=float, default=30,
+        help="Cap on the exponential retry delay in seconds (default: 30)",
+    )
+    p.add_argument(
+        "--retry-jitter", type=float, default=0.5,
+        help="Random jitter factor added to retry delays, 0 disables (default: 0.5)",
     )
     p.add_argument(
         "--timeout", type=int, default=300,
@@ -82,6 +105,9 @@ def parse_args():
         p.error("PATH is required (positional, --path, or set RL_PATH)")
     args.target_path = target
 
+    if args.workers < 1:
+        p.error("--workers must be at least 1")
+
     if not args.host:
         p.error("--host is required (or set RL_HOST)")
     if not args.token:
@@ -91,11 +117,85 @@ def parse_args():
 
 
 # ---------------------------------------------------------------------------
-# Timeout patching
+# Rate limiting
+# ---------------------------------------------------------------------------
+
+class RateLimiter:
+    """Token bucket shared by all upload workers.
+
+    Releases one permit every `interval` seconds so the aggregate upload
+    rate matches the old one-file-per-sleep pacing, regardless of how
+    many workers are in flight.
+    """
+
+    def __init__(self, interval):
+        self._interval = interval
+        self._lock = threading.Lock()
+        self._next_slot = 0.0
+
+    def acquire(self):
+        if self._interval <= 0:
+            return
+        with self._lock:
+            now = time.monotonic()
+            wait = self._next_slot - now
+            self._next_slot = max(now, self._next_slot) + self._interval
+        if wait > 0:
+            time.sleep(wait)
+
+
+# ---------------------------------------------------------------------------
+# Session patching
 # ---------------------------------------------------------------------------
 
+def patch_session(pool_size):
+    """Monkey-patch requests so the SDK's sessions get a Keep-Alive
+    connection pool sized for the worker count.
+
+    Without this every upload may pay a fresh TCP+TLS handshake; with a
+    mounted HTTPAdapter the pool reuses connections across uploads and
+    workers.  Retries stay disabled at the transport level -- retry
+    policy lives in upload_with_retry.
+    """
+    original_init = requests.Session.__init__
+
+    def patched_init(self, *init_args, **init_kwargs):
+        original_init(self, *init_args, **init_kwargs)
+        adapter = requests.adapters.HTTPAdapter(
+            pool_connections=pool_size, pool_maxsize=pool_size * 2, max_retries=0)
+        self.mount("https://", adapter)
+        self.mount("http://", adapter)
+        self.headers["Connection"] = "keep-alive"
+
+    requests.Session.__init__ = patched_init
+
+
+def _find_sdk_session(a1000):
+    """Return the SDK client's internal requests.Session, if exposed."""
+    for name in ("_session", "session", "_conn", "_http"):
+        candidate = getattr(a1000, name, None)
+        if isinstance(candidate, requests.Session):
+            return candidate
+    return None
+
+
+def set_session_timeout(session, timeout):
+    """Inject a default timeout into send on this Session instance only."""
+    original_send = session.send
+
+    def patched_send(request, **kwargs):
+        kwargs.setdefault("timeout", timeout)
+        return original_send(request, **kwargs)
+
+    session.send = patched_send
+
+
 def patch_timeout(timeout):
-    """Monkey-patch requests so the SDK respects a default timeout."""
+    """Monkey-patch requests so the SDK respects a default timeout.
+
+    Global fallback for SDK versions that don't expose their Session;
+    prefer set_session_timeout on the client's own session.
+    """
     original_send = requests.Session.send
 
     def patched_send(self, request, **kwargs):
@@ -109,32 +209,94 @@ def patch_timeout(timeout):
 # SDK method resolution
 # ---------------------------------------------------------------------------
 
+@functools.lru_cache(maxsize=32)
+def _first_param_name(func):
+    """Return the first non-self parameter name of func, or None.
+
+    Cached because inspect.signature walks the code object and allocates
+    Parameter objects on every call.
+    """
+    params = list(inspect.signature(func).parameters.keys())
+    if params and params[0] == "self":
+        params = params[1:]
+    return params[0] if params else None
+
+
+@functools.lru_cache(maxsize=32)
+def _accepts_kwarg(func, name):
+    """Return True if func's signature has a parameter called name (cached)."""
+    return name in inspect.signature(func).parameters
+
+
 def _make_path_caller(method):
     """Build a callable(file_path) that calls a path-based SDK upload method.
 
     Inspects the method signature to find the correct parameter name
     (file_path, file_source, sample_path, ...).  Falls back to positional.
     """
-    sig = inspect.signature(method)
-    params = list(sig.parameters.keys())
-    # First non-self parameter is the path arg
-    path_param = params[1] if len(params) > 1 and params[0] == "self" else (params[0] if params else None)
+    path_param = _first_param_name(method)
     if path_param:
         return lambda fp, m=method, p=path_param: m(**{p: fp})
     return lambda fp, m=method: m(fp)
 
 
+# Files above this size are memory-mapped instead of read in chunks.
+_MMAP_THRESHOLD = 16 * 1024 * 1024
+
+
+class _MappedFile:
+    """Read-only file-like view over a memory-mapped file.
+
+    A bare mmap has no name attribute, but SDKs (and requests'
+    guess_filename) derive the upload filename from it, so this proxy
+    delegates the file-object protocol to the mmap while exposing the
+    name and fileno of the underlying file -- handle-based uploads then
+    behave identically on both sides of the size threshold.
+    """
+
+    def __init__(self, fh, mapped):
+        self._fh = fh
+        self._mapped = mapped
+        self.name = fh.name
+
+    def read(self, size=-1):
+        return self._mapped.read(size)
+
+    def seek(self, pos, whence=0):
+        return self._mapped.seek(pos, whence)
+
+    def tell(self):
+        return self._mapped.tell()
+
+    def fileno(self):
+        return self._fh.fileno()
+
+
 def _make_handle_caller(method):
-    """Build a callable(file_path) that opens a file and calls a handle-based SDK upload method."""
-    sig = inspect.signature(method)
-    params = list(sig.parameters.keys())
-    handle_param = params[1] if len(params) > 1 and params[0] == "self" else (params[0] if params else None)
+    """Build a callable(file_path) that opens a file and calls a handle-based SDK upload method.
+
+    Large files are served through a _MappedFile (a read-only mmap view)
+    so the SDK streams pages straight from the page cache instead of
+    copying chunk-by-chunk through a userspace buffer.  Small files keep
+    the plain file handle to avoid mmap setup overhead.
+    """
+    handle_param = _first_param_name(method)
+
+    def _call(m, p, handle):
+        if p:
+            return m(**{p: handle})
+        return m(handle)
 
     def _upload(fp, m=method, p=handle_param):
         with open(fp, "rb") as fh:
-            if p:
-                return m(**{p: fh})
-            return m(fh)
+            size = os.fstat(fh.fileno()).st_size
+            if size > _MMAP_THRESHOLD:
+                mapped = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+                try:
+                    return _call(m, p, _MappedFile(fh, mapped))
+                finally:
+                    mapped.close()
+            return _call(m, p, fh)
     return _upload
 
 
@@ -167,62 +329,206 @@ def resolve_upload_fn(a1000):
 # File collection
 # ---------------------------------------------------------------------------
 
-def collect_files(target_path, recursive, excludes):
-    """Return (file_list, skipped_count).
+_WILDCARD_CHARS = "*?["
 
-    file_list contains absolute paths. skipped_count is the number of
-    files that matched an exclude pattern.
+
+def _compile_excludes(excludes, as_bytes=False):
+    """Union all exclude patterns into a single compiled regex.
+
+    One C-level regex match per filename replaces a Python-level
+    fnmatch call per pattern.  With as_bytes the regex is compiled to
+    match bytes filenames (same fsencode encoding scandir uses).
+    Returns None when there are no patterns.
+    """
+    if not excludes:
+        return None
+    pattern = "|".join(f"(?:{fnmatch.translate(p)})" for p in excludes)
+    if as_bytes:
+        pattern = os.fsencode(pattern)
+    return re.compile(pattern)
+
+
+class ExcludeMatcher:
+    """Matches filenames against --exclude patterns.
+
+    Patterns are split into a basename fast pass and a path slow pass:
+    patterns without a "/" (the common case) match against the bare
+    filename, while patterns containing "/" -- which previously could
+    never match -- are tested against the path relative to the scan
+    root, and only when the basename pass missed, so the relative path
+    isn't even built for most entries.
+
+    Within the basename pass, wildcard-free patterns go into an
+    exact-match set checked with one O(1) lookup; only patterns that
+    actually contain glob characters hit the compiled union regex.
+    With drop_on_match (safe only when each basename can be seen at
+    most once, i.e. a non-recursive scan), an exact pattern is retired
+    after its first hit, so long exact exclude lists cost O(N + M) over
+    the run instead of O(N*M).
     """
+
+    def __init__(self, excludes, drop_on_match=False, as_bytes=False):
+        bname_patterns = [p for p in excludes if "/" not in p]
+        path_patterns = [p for p in excludes if "/" in p]
+        exact = (p for p in bname_patterns if not any(c in p for c in _WILDCARD_CHARS))
+        self._exact = {os.fsencode(p) for p in exact} if as_bytes else set(exact)
+        globs = [p for p in bname_patterns if any(c in p for c in _WILDCARD_CHARS)]
+        self._union = _compile_excludes(globs, as_bytes)
+        self._path_union = _compile_excludes(path_patterns, as_bytes)
+        self._drop_on_match = drop_on_match
+
+    @property
+    def has_path_patterns(self):
+        return self._path_union is not None
+
+    def match(self, name):
+        if name in self._exact:
+            if self._drop_on_match:
+                self._exact.discard(name)
+            return True
+        return self._union is not None and self._union.match(name) is not None
+
+    def match_path(self, rel_path):
+        return self._path_union is not None and self._path_union.search(rel_path) is not None
+
+
+def iter_files(target_path, recursive, excludes, stats):
+    """Yield absolute paths of files to upload, streaming as they are found.
+
+    Walks with os.scandir and a manual directory stack instead of
+    materializing (and sorting) the whole tree up front, so the first
+    upload can start before the scan finishes and no O(N) path list is
+    held in memory.  stats["skipped"] is incremented for every file that
+    matched an exclude pattern.
+    """
+    # abspath always pays a getcwd + normalization; skip it when the
+    # caller already gave us an absolute path.
+    abs_target = target_path if os.path.isabs(target_path) else os.path.abspath(target_path)
+
     if os.path.isfile(target_path):
+        excluded = ExcludeMatcher(excludes, drop_on_match=True)
         basename = os.path.basename(target_path)
-        for pattern in excludes:
-            if fnmatch.fnmatch(basename, pattern):
-                return [], 1
-        return [os.path.abspath(target_path)], 0
+        if excluded.match(basename) or excluded.match_path(abs_target):
+            stats["skipped"] += 1
+            return
+        yield abs_target
+        return
 
     if not os.path.isdir(target_path):
         print(f"ERROR: Path does not exist: {target_path}", file=sys.stderr)
         sys.exit(1)
 
-    files = []
-    skipped = 0
-
-    if recursive:
-        for root, _dirs, filenames in os.walk(target_path):
-            for fname in filenames:
-                full = os.path.join(root, fname)
-                if not os.path.isfile(full):
-                    continue
-                if any(fnmatch.fnmatch(fname, p) for p in excludes):
-                    skipped += 1
-                    continue
-                files.append(os.path.abspath(full))
-    else:
-        for fname in os.listdir(target_path):
-            full = os.path.join(target_path, fname)
-            if not os.path.isfile(full):
-                continue
-            if any(fnmatch.fnmatch(fname, p) for p in excludes):
-                skipped += 1
-                continue
-            files.append(os.path.abspath(full))
+    # Walk with bytes paths on POSIX so scandir skips the per-entry
+    # filename decode; only accepted files are fsdecoded for the
+    # uploader.  Windows paths are natively UTF-16, so stay on str there.
+    # Exact patterns may be retired after a hit only when basenames are
+    # unique, which a recursive walk cannot guarantee.
+    as_bytes = sys.platform != "win32"
+    excluded = ExcludeMatcher(excludes, drop_on_match=not recursive, as_bytes=as_bytes)
+    abs_root = os.fsencode(abs_target) if as_bytes else abs_target
+
+    stack = [abs_root]
+    while stack:
+        root = stack.pop()
+        try:
+            with os.scandir(root) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        if recursive:
+                            stack.append(entry.path)
+                        continue
+                    # d_type from the directory read -- no extra stat per entry
+                    if not entry.is_file(follow_symlinks=False):
+                        continue
+                    if excluded.match(entry.name) or (
+                            excluded.has_path_patterns
+                            and excluded.match_path(os.path.relpath(entry.path, abs_root))):
+                        stats["skipped"] += 1
+                        continue
+                    # stack roots are absolute, so entry.path already is too
+                    yield os.fsdecode(entry.path) if as_bytes else entry.path
+        except OSError as exc:
+            # Unreadable or vanished directory -- skip it and keep
+            # walking, like os.walk's default onerror=None behavior
+            print(f"WARNING: Skipping directory {os.fsdecode(root)}: {exc}", file=sys.stderr)
 
-    files.sort()
-    return files, skipped
+
+# ---------------------------------------------------------------------------
+# Read-ahead
+# ---------------------------------------------------------------------------
+
+def prefetch_file(path):
+    """Ask the kernel to start reading a file into the page cache.
+
+    Best effort and asynchronous: by the time an upload worker opens the
+    file its data is already (partially) cached instead of being read
+    cold mid-upload.  Errors are ignored -- the upload path reports them.
+    """
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_WILLNEED)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
 
 
 # ---------------------------------------------------------------------------
 # Upload with retry
 # ---------------------------------------------------------------------------
 
-def upload_with_retry(upload_fn, file_path, retries, retry_delay):
+# Transient transport failures worth another attempt.
+_RETRYABLE_EXC = (
+    requests.exceptions.Timeout,
+    requests.exceptions.ConnectionError,
+    requests.exceptions.ChunkedEncodingError,
+)
+
+# Status codes that signal a transient server-side condition.  Other 5xx
+# codes (501, 505, ...) indicate a permanent problem and fail fast.
+_RETRYABLE_STATUS = frozenset({429, 500, 502, 503, 504})
+
+
+def _retry_after_seconds(response):
+    """Parse a Retry-After header into seconds, or None if absent/invalid.
+
+    Accepts both the integer-seconds and HTTP-date forms.  SDK-wrapped
+    response objects may carry a status_code but no headers at all, so
+    don't assume the attribute exists.
+    """
+    headers = getattr(response, "headers", None)
+    value = headers.get("Retry-After") if headers is not None else None
+    if not value:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    try:
+        when = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when is None:
+        return None
+    return max(0.0, when.timestamp() - time.time())
+
+
+def upload_with_retry(upload_fn, file_path, retries, retry_delay, max_delay, jitter):
     """Try uploading a file, retrying on transient errors.
 
-    Returns (response, error_string).  On success error_string is None.
+    Backoff is exponential (retry_delay doubled per attempt, capped at
+    max_delay) with random jitter so parallel workers don't retry in
+    lockstep.  A server-provided Retry-After on 429/503 takes precedence
+    when it is longer.  Returns (response, error_string); on success
+    error_string is None.
     """
     last_err = "unknown error"
 
     for attempt in range(1, retries + 1):
+        retry_after = None
         try:
             response = upload_fn(file_path)
             code = response.status_code
@@ -231,32 +537,34 @@ def upload_with_retry(upload_fn, file_path, retries, retry_delay):
                 return response, None
 
             # Decide whether to retry
-            if code == 429 or code >= 500:
+            if code in _RETRYABLE_STATUS:
                 last_err = f"HTTP {code}"
+                if code in (429, 503):
+                    retry_after = _retry_after_seconds(response)
             else:
-                # 4xx (not 429) -- don't retry
                 return response, f"HTTP {code}"
 
-        except requests.exceptions.Timeout:
-            last_err = "timeout"
-        except requests.exceptions.ConnectionError as exc:
-            last_err = f"connection error: {exc}"
+        except _RETRYABLE_EXC as exc:
+            last_err = f"{type(exc).__name__}: {exc}" if str(exc) else type(exc).__name__
         except Exception as exc:
             # SDK may wrap HTTP errors in its own exceptions.
             # If the exception carries a response, check if it is retryable.
-            inner_resp = getattr(exc, "response", None)
-            if inner_resp is not None and hasattr(inner_resp, "status_code"):
-                code = inner_resp.status_code
-                if code == 429 or code >= 500:
-                    last_err = f"HTTP {code} (via {type(exc).__name__})"
-                else:
-                    return None, f"HTTP {code}"
+            code = getattr(getattr(exc, "response", None), "status_code", None)
+            if code in _RETRYABLE_STATUS:
+                last_err = f"HTTP {code} (via {type(exc).__name__})"
+                if code in (429, 503):
+                    retry_after = _retry_after_seconds(exc.response)
+            elif code is not None:
+                return None, f"HTTP {code}"
             else:
                 # Truly unknown error -- don't retry
                 return None, str(exc)
 
         if attempt < retries:
-            wait = retry_delay * attempt
+            wait = min(max_delay, retry_delay * (2 ** (attempt - 1)))
+            wait *= 1 + random.random() * jitter
+            if retry_after is not None:
+                wait = max(wait, retry_after)
             pad = " " * 10
             print(f"{pad}Attempt {attempt}/{retries}: {last_err}, retrying in {wait:.0f}s...")
             time.sleep(wait)
@@ -268,15 +576,19 @@ def upload_with_retry(upload_fn, file_path, retries, retry_delay):
 # Output helpers
 # ---------------------------------------------------------------------------
 
-def print_header(target_path, recursive, file_count):
-    print()
-    print("Spectra Analyze Bulk Uploader")
-    print("\u2500" * 29)
-    mode = "(single file)" if os.path.isfile(target_path) else ""
-    print(f"Path:       {target_path} {mode}".rstrip())
-    if not os.path.isfile(target_path):
-        print(f"Recursive:  {'yes' if recursive else 'no'}")
-    print()
+def print_header(target_path, recursive, is_single):
+    # Single buffered write instead of one lock/flush per print() call
+    mode = "(single file)" if is_single else ""
+    lines = [
+        "",
+        "Spectra Analyze Bulk Uploader",
+        "\u2500" * 29,
+        f"Path:       {target_path} {mode}".rstrip(),
+    ]
+    if not mode:
+        lines.append(f"Recursive:  {'yes' if recursive else 'no'}")
+    lines.append("")
+    sys.stdout.write("\n".join(lines) + "\n")
 
 
 def print_summary(uploaded, failed, skipped, total):
@@ -286,10 +598,8 @@ def print_summary(uploaded, failed, skipped, total):
     parts.append(f"{total} total")
     summary = " \u2502 ".join(parts)
     bar = "\u2550" * (len(summary) + 8)
-    print()
-    print(bar)
-    print(f"  Done.  {summary}")
-    print(bar)
+    sys.stdout.write("\n".join(["", bar, f"  Done.  {summary}", bar]) + "\n")
+    sys.stdout.flush()
 
 
 # ---------------------------------------------------------------------------
@@ -307,59 +617,100 @@ def main():
         print("       Run: pip install reversinglabs-sdk-py3", file=sys.stderr)
         sys.exit(1)
 
-    # Patch timeout before any SDK HTTP calls
-    patch_timeout(args.timeout)
+    # Patch connection pooling before the SDK creates its Session
+    patch_session(args.workers)
 
     # Initialise SDK client -- only pass user_agent if the constructor accepts it
     init_kwargs = dict(host=args.host, token=args.token, verify=args.verify_ssl)
-    init_sig = inspect.signature(A1000.__init__)
-    if "user_agent" in init_sig.parameters:
+    if _accepts_kwarg(A1000.__init__, "user_agent"):
         init_kwargs["user_agent"] = "rl-bulk-uploader/1.0"
     a1000 = A1000(**init_kwargs)
 
-    upload_fn = resolve_upload_fn(a1000)
+    # Apply the timeout to the SDK's own Session when it is exposed,
+    # falling back to the process-wide send patch otherwise.
+    session = _find_sdk_session(a1000)
+    if session is not None:
+        set_session_timeout(session, args.timeout)
+    else:
+        patch_timeout(args.timeout)
 
-    # Collect files
-    files, skipped = collect_files(args.target_path, args.recursive, args.exclude)
-    total_seen = len(files) + skipped
+    upload_fn = resolve_upload_fn(a1000)
 
-    # Header
-    print_header(args.target_path, args.recursive, len(files))
+    # Stream files as they are discovered; --sorted buffers the old way
+    stats = {"skipped": 0}
+    files_iter = iter_files(args.target_path, args.recursive, args.exclude, stats)
+    if args.sorted:
+        files_iter = iter(sorted(files_iter))
 
-    print(f"Scanning ...")
-    if skipped > 0:
-        print(f"Found {total_seen} files ({skipped} excluded)")
-    else:
-        print(f"Found {len(files)} files")
-    print()
+    # Decide the display mode once instead of re-stating the target
+    # in the header and base-path computations below
+    is_single = os.path.isfile(args.target_path)
 
-    if not files:
-        print_summary(0, 0, skipped, total_seen)
-        return
+    # Header
+    print_header(args.target_path, args.recursive, is_single)
 
     uploaded = 0
     failed = 0
-    width = len(str(len(files)))
-    base_path = args.target_path if os.path.isdir(args.target_path) else os.path.dirname(args.target_path)
+    done = 0
+    base_path = os.path.dirname(args.target_path) if is_single else args.target_path
 
-    for idx, fpath in enumerate(files, 1):
-        rel = os.path.relpath(fpath, base_path)
-        response, err = upload_with_retry(upload_fn, fpath, args.retries, args.retry_delay)
+    # One permit every sleep/workers seconds keeps the aggregate rate at
+    # the configured pacing while N uploads are in flight.
+    limiter = RateLimiter(args.sleep / args.workers)
+
+    def _upload_one(fpath):
+        limiter.acquire()
+        return upload_with_retry(
+            upload_fn, fpath, args.retries, args.retry_delay,
+            args.max_retry_delay, args.retry_jitter,
+        )
 
-        counter = f"[{idx:>{width}}/{len(files)}]"
+    futures = {}
+
+    def _report(future):
+        nonlocal uploaded, failed, done
+        fpath = futures.pop(future)
+        rel = os.path.relpath(fpath, base_path)
+        response, err = future.result()
+        done += 1
 
         if err is None:
-            print(f"{counter} [OK]   {rel} (HTTP {response.status_code})")
+            sys.stdout.write(f"[{done}] [OK]   {rel} (HTTP {response.status_code})\n")
             uploaded += 1
         else:
-            print(f"{counter} [FAIL] {rel} ({err})")
+            sys.stdout.write(f"[{done}] [FAIL] {rel} ({err})\n")
             failed += 1
 
-        # Sleep between uploads (but not after the last one)
-        if idx < len(files):
-            time.sleep(args.sleep)
-
-    print_summary(uploaded, failed, skipped, total_seen)
+        # Flush at batch boundaries; terminals line-buffer on their own
+        if done % 100 == 0:
+            sys.stdout.flush()
+
+    # Cap in-flight futures so the scan doesn't race ahead of the uploads
+    max_inflight = args.workers * 2
+
+    # Warm the page cache ahead of the uploads (no posix_fadvise on Windows)
+    prefetcher = None
+    if hasattr(os, "posix_fadvise"):
+        prefetcher = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=args.workers) as pool:
+        for fpath in files_iter:
+            if prefetcher is not None:
+                prefetcher.submit(prefetch_file, fpath)
+            futures[pool.submit(_upload_one, fpath)] = fpath
+            if len(futures) >= max_inflight:
+                completed, _ = concurrent.futures.wait(
+                    futures, return_when=concurrent.futures.FIRST_COMPLETED)
+                for future in completed:
+                    _report(future)
+        for future in concurrent.futures.as_completed(list(futures)):
+            _report(future)
+
+    if prefetcher is not None:
+        prefetcher.shutdown(wait=False)
+
+    skipped = stats["skipped"]
+    print_summary(uploaded, failed, skipped, done + skipped)
 
     # Exit with non-zero if anything failed
     if failed > 0: